@@ -0,0 +1,246 @@
+import os
+import csv
+import yaml
+import numpy as np
+import cv2
+from concurrent.futures import ProcessPoolExecutor
+from ultralytics.data.utils import check_det_dataset
+
+
+def dhash(gray, hash_size=8):
+    """差值哈希：比较相邻像素的亮度大小，返回 64 位整数"""
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized[:, 1:] > resized[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def phash(gray, hash_size=8, highfreq_factor=4):
+    """感知哈希：取 DCT 低频分量与中值比较，返回 64 位整数"""
+    size = hash_size * highfreq_factor
+    resized = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(resized))
+    low = dct[:hash_size, :hash_size]
+    # 直流分量不参与中值计算，避免整体亮度主导结果
+    bits = (low > np.median(low.flatten()[1:])).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming(a, b):
+    """两个哈希值之间的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def compute_hashes(image_path):
+    """计算单张图像的 (pHash, dHash)，读取失败时返回 None"""
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    return phash(img), dhash(img)
+
+
+class BKTree:
+    """以汉明距离为度量的 BK 树，用于亚线性的近邻查询"""
+
+    def __init__(self):
+        # 节点结构: [哈希值, 数据, {距离: 子节点}]
+        self.root = None
+        self.size = 0
+
+    def add(self, item_hash, item):
+        node = [item_hash, item, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        cur = self.root
+        while True:
+            d = hamming(item_hash, cur[0])
+            child = cur[2].get(d)
+            if child is None:
+                cur[2][d] = node
+                return
+            cur = child
+
+    def query(self, item_hash, radius):
+        """返回所有与 item_hash 距离不超过 radius 的 (距离, 数据)"""
+        found = []
+        if self.root is None:
+            return found
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(item_hash, node[0])
+            if d <= radius:
+                found.append((d, node[1]))
+            # 三角不等式：只有距离落在 [d - radius, d + radius] 的子树才可能命中
+            for child_d, child in node[2].items():
+                if d - radius <= child_d <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def find_near_duplicates(image_paths, phash_radius=6, dhash_radius=10, workers=None):
+    """
+    对图像列表去重，返回 (保留列表, 重复列表)
+    重复列表中每项为 (重复图像, 被保留的相似图像, pHash 距离)
+    按路径排序依次处理，视频抽帧的相邻帧会被归并到最早出现的一帧
+    """
+    image_paths = sorted(image_paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashes = list(executor.map(compute_hashes, image_paths, chunksize=64))
+
+    tree = BKTree()
+    kept, duplicates = [], []
+    for path, h in zip(image_paths, hashes):
+        if h is None:
+            print(f"无法读取图像，跳过：{path}")
+            continue
+        p, d = h
+        match = None
+        # pHash 负责 BK 树检索，dHash 二次确认以降低误判
+        for dist, (kept_path, kept_dhash) in sorted(tree.query(p, phash_radius)):
+            if hamming(d, kept_dhash) <= dhash_radius:
+                match = (kept_path, dist)
+                break
+        if match is None:
+            tree.add(p, (path, d))
+            kept.append(path)
+        else:
+            duplicates.append((path, match[0], match[1]))
+    return kept, duplicates
+
+
+def list_images(split):
+    """
+    列出数据集某个划分的图像，split 为 check_det_dataset 解析后的 train / val 字段
+    可以是图像目录、txt 图像列表，或二者组成的列表
+    """
+    exts = ('.jpg', '.jpeg', '.png', '.bmp')
+    image_paths = []
+    for entry in (split if isinstance(split, list) else [split]):
+        if os.path.isdir(entry):
+            image_paths.extend(
+                os.path.join(entry, f)
+                for f in os.listdir(entry)
+                if f.lower().endswith(exts)
+            )
+        elif os.path.isfile(entry):
+            base = os.path.dirname(entry)
+            with open(entry, 'r', encoding='utf-8') as f:
+                image_paths.extend(
+                    os.path.normpath(os.path.join(base, line.strip()))
+                    for line in f
+                    if line.strip().lower().endswith(exts)
+                )
+    return image_paths
+
+
+def write_dedup_split(data, kept, save_dir):
+    """
+    写出去重后的训练集列表，以及一份 train 字段指向该列表的 data.yaml
+    data 为 check_det_dataset 的结果，val / test 已解析为绝对路径
+    ultralytics 支持 txt 形式的图像列表，标签路径会按 images -> labels 自动推导
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    split_path = os.path.abspath(os.path.join(save_dir, "train_dedup.txt"))
+    with open(split_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(os.path.abspath(p) for p in kept) + "\n")
+
+    names = data['names']
+    out = {
+        'train': split_path,
+        'val': data['val'],
+        'nc': data['nc'],
+        'names': [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names),
+    }
+    if data.get('test'):
+        out['test'] = data['test']
+
+    dedup_yaml = os.path.join(save_dir, "data_dedup.yaml")
+    with open(dedup_yaml, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(out, f, allow_unicode=True, sort_keys=False)
+    return split_path, dedup_yaml
+
+
+def read_epoch_stats(results_csv):
+    """从训练输出的 results.csv 读取平均每轮耗时（秒）与最佳 mAP50 / mAP50-95"""
+    with open(results_csv, 'r', encoding='utf-8') as f:
+        rows = [{k.strip(): v for k, v in row.items()} for row in csv.DictReader(f)]
+    # time 列为累计耗时
+    times = [float(r['time']) for r in rows]
+    epoch_time = times[-1] / len(times)
+    map50 = max(float(r['metrics/mAP50(B)']) for r in rows)
+    map50_95 = max(float(r['metrics/mAP50-95(B)']) for r in rows)
+    return epoch_time, map50, map50_95
+
+
+def compare_training(data_yaml, dedup_yaml, epochs=30, imgsz=416, batch=32):
+    """分别在原始数据与去重数据上训练相同轮数，对比每轮耗时与 mAP"""
+    from ultralytics import YOLO
+
+    stats = {}
+    for tag, yaml_path in (("full", data_yaml), ("dedup", dedup_yaml)):
+        model = YOLO('../yolo11n.pt')
+        model.train(
+            data=os.path.abspath(yaml_path),
+            imgsz=imgsz,
+            epochs=epochs,
+            batch=batch,
+            name=f'dedup_cmp_{tag}'
+        )
+        stats[tag] = read_epoch_stats(os.path.join(model.trainer.save_dir, "results.csv"))
+
+    (t_full, m50_full, m95_full), (t_dedup, m50_dedup, m95_dedup) = stats["full"], stats["dedup"]
+    print(f"每轮耗时: {t_full:.1f}s -> {t_dedup:.1f}s (节省 {(1 - t_dedup / t_full) * 100:.1f}%)")
+    print(f"mAP50:    {m50_full:.4f} -> {m50_dedup:.4f}")
+    print(f"mAP50-95: {m95_full:.4f} -> {m95_dedup:.4f}")
+    return stats
+
+
+def main():
+    # 数据集配置，训练集图像目录由其中的 train 字段解析得到
+    data_yaml = os.path.abspath("../data/data/data.yaml")
+    save_dir = "../data/data/dedup"
+    # 已有训练记录，用于估算节省的训练时间
+    baseline_results = "../runs/detect/yolov115/results.csv"
+    # 汉明距离阈值（64 位哈希），可修改
+    phash_radius = 6
+    dhash_radius = 10
+    # 是否实际训练两组模型对比 mAP（耗时较长）
+    run_compare = False
+
+    data = check_det_dataset(data_yaml)
+    image_paths = list_images(data['train'])
+    if not image_paths:
+        print(f"没有找到图像文件：{data['train']}")
+        return
+
+    kept, duplicates = find_near_duplicates(image_paths, phash_radius, dhash_radius)
+    split_path, dedup_yaml = write_dedup_split(data, kept, save_dir)
+
+    with open(os.path.join(save_dir, "duplicates.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["duplicate", "kept", "phash_distance"])
+        writer.writerows(duplicates)
+
+    total = len(kept) + len(duplicates)
+    ratio = len(duplicates) / total if total else 0.0
+    print(f"共 {total} 张图像，保留 {len(kept)} 张，近重复 {len(duplicates)} 张 ({ratio * 100:.1f}%)")
+    print(f"去重列表：{split_path}")
+    print(f"数据配置：{dedup_yaml}")
+
+    # 训练耗时与训练集图像数近似成正比
+    if os.path.exists(baseline_results):
+        epoch_time, map50, map50_95 = read_epoch_stats(baseline_results)
+        print(f"估算：基线每轮约 {epoch_time:.1f}s，按图像数线性推算去重后约 {epoch_time * (1 - ratio):.1f}s"
+              f"（仅为估算，并非实测）")
+        print(f"基线 mAP50={map50:.4f}, mAP50-95={map50_95:.4f}（仅供参考，不是去重后的结果）")
+
+    if run_compare:
+        compare_training(data_yaml, dedup_yaml)
+    else:
+        print("未进行 mAP 对比：将 run_compare 设为 True 以实际训练两组模型，对比每轮耗时与 mAP")
+
+
+if __name__ == "__main__":
+    main()
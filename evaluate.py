@@ -0,0 +1,451 @@
+import os
+import time
+import yaml
+import numpy as np
+
+
+# COCO 风格的 10 个 IoU 阈值 0.5:0.95
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+# 缓存预测时的置信度下限，取 model.val() 的默认值
+CACHE_CONF = 0.001
+
+
+def box_iou(a, b):
+    """两组 xyxy 框的 IoU 矩阵，形状 (len(a), len(b))"""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def nms(boxes, scores, classes, iou_thres):
+    """按类别的贪心 NMS，返回保留下标（按分数降序）；循环次数等于保留框数"""
+    keep = []
+    for c in np.unique(classes):
+        idx = np.flatnonzero(classes == c)
+        remaining = idx[np.argsort(-scores[idx])]
+        while remaining.size:
+            i = remaining[0]
+            keep.append(i)
+            rest = remaining[1:]
+            remaining = rest[box_iou(boxes[i:i + 1], boxes[rest])[0] <= iou_thres]
+    keep = np.array(keep, dtype=np.int64)
+    return keep[np.argsort(-scores[keep])]
+
+
+def match_predictions(pred_boxes, pred_cls, gt_boxes, gt_cls):
+    """与 ultralytics 相同的一对一匹配，返回 (预测数, 10) 的 TP 矩阵"""
+    correct = np.zeros((len(pred_boxes), len(IOU_THRESHOLDS)), dtype=bool)
+    if len(pred_boxes) == 0 or len(gt_boxes) == 0:
+        return correct
+    iou = box_iou(gt_boxes, pred_boxes) * (gt_cls[:, None] == pred_cls[None, :])
+    for k, t in enumerate(IOU_THRESHOLDS):
+        matches = np.stack(np.nonzero(iou >= t), 1)
+        if len(matches) > 1:
+            # IoU 从高到低，每个预测、每个真实框最多匹配一次
+            matches = matches[iou[matches[:, 0], matches[:, 1]].argsort()[::-1]]
+            matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
+            matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
+        correct[matches[:, 1], k] = True
+    return correct
+
+
+def compute_ap(recall, precision):
+    """101 点插值的 AP，返回 (AP, 精度包络, 召回)"""
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)
+    y = np.interp(x, mrec, mpre)
+    return float(((y[1:] + y[:-1]) / 2 * np.diff(x)).sum()), mpre, mrec
+
+
+def ap_per_class(tp, conf, pred_cls, target_cls, num_classes, eps=1e-16):
+    """逐类别计算 AP 与 P/R/F1 曲线（横轴为置信度 0~1 的 1000 个点）"""
+    order = np.argsort(-conf)
+    tp, conf, pred_cls = tp[order], conf[order], pred_cls[order]
+    x = np.linspace(0, 1, 1000)
+
+    ap = np.zeros((num_classes, tp.shape[1]))
+    p_curve = np.zeros((num_classes, 1000))
+    r_curve = np.zeros((num_classes, 1000))
+    pr_curve = np.zeros((num_classes, 1000))
+    nt = np.bincount(target_cls, minlength=num_classes)
+    for c in range(num_classes):
+        i = pred_cls == c
+        if nt[c] == 0 or not i.any():
+            continue
+        tpc = tp[i].cumsum(0)
+        fpc = (1 - tp[i]).cumsum(0)
+        recall = tpc / (nt[c] + eps)
+        precision = tpc / (tpc + fpc)
+        r_curve[c] = np.interp(-x, -conf[i], recall[:, 0], left=0)
+        p_curve[c] = np.interp(-x, -conf[i], precision[:, 0], left=1)
+        for j in range(tp.shape[1]):
+            ap[c, j], mpre, mrec = compute_ap(recall[:, j], precision[:, j])
+            if j == 0:
+                pr_curve[c] = np.interp(x, mrec, mpre)
+
+    f1_curve = 2 * p_curve * r_curve / (p_curve + r_curve + eps)
+    present = nt > 0
+    # 与 ultralytics 一致：在平均 F1 最大的置信度处取 P/R
+    best = f1_curve[present].mean(0).argmax() if present.any() else 0
+    return {
+        'ap': ap, 'present': present,
+        'p': p_curve[:, best], 'r': r_curve[:, best], 'f1': f1_curve[:, best],
+        'x': x, 'p_curve': p_curve, 'r_curve': r_curve, 'f1_curve': f1_curve, 'pr_curve': pr_curve,
+    }
+
+
+class PredictionCache:
+    """验证集的 NMS 前预测与真实标注，按图像连续存放，可反复离线评估"""
+
+    def __init__(self, path, weights=None, imgsz=None, data_yaml=None, image_files=None):
+        data = np.load(path, allow_pickle=False)
+        # 缓存记录了生成它的权重（路径、修改时间、大小）、输入尺寸与验证集，与期望不符时拒绝使用
+        self.weights, self.imgsz = str(data['weights']), int(data['imgsz'])
+        self.data_yaml = str(data['data_yaml'])
+        self.names = [str(n) for n in data['names']]
+        self.image_files = [str(p) for p in data['image_files']]
+        if weights is not None:
+            if os.path.abspath(weights) != self.weights:
+                raise ValueError(f"缓存来自 {self.weights}，而非 {os.path.abspath(weights)}")
+            if weights_signature(weights) != (float(data['weights_mtime']), int(data['weights_size'])):
+                raise ValueError(f"权重 {weights} 在生成缓存后被修改")
+        if imgsz is not None and int(imgsz) != self.imgsz:
+            raise ValueError(f"缓存的输入尺寸为 {self.imgsz}，而非 {imgsz}")
+        if data_yaml is not None and os.path.abspath(data_yaml) != self.data_yaml:
+            raise ValueError(f"缓存来自数据集 {self.data_yaml}，而非 {os.path.abspath(data_yaml)}")
+        if image_files is not None and list(image_files) != self.image_files:
+            raise ValueError("验证集图像列表与缓存不一致")
+        self.boxes, self.scores, self.classes = data['boxes'], data['scores'], data['classes']
+        self.gt_boxes, self.gt_classes = data['gt_boxes'], data['gt_classes']
+        n = len(self.image_files)
+        # 每张图像的预测 / 标注在扁平数组中的起止位置
+        self.pred_offsets = np.searchsorted(data['pred_image'], np.arange(n + 1))
+        self.gt_offsets = np.searchsorted(data['gt_image'], np.arange(n + 1))
+        # NMS 只与 IoU 阈值有关：置信度过滤与 NMS 可交换，故按 IoU 阈值缓存保留结果
+        self._nms_cache = {}
+
+    @property
+    def num_classes(self):
+        return len(self.names)
+
+    def nms_keep(self, iou):
+        if iou not in self._nms_cache:
+            keep = []
+            for s, e in zip(self.pred_offsets[:-1], self.pred_offsets[1:]):
+                keep.append(s + nms(self.boxes[s:e], self.scores[s:e], self.classes[s:e], iou))
+            self._nms_cache[iou] = keep
+        return self._nms_cache[iou]
+
+
+def weights_signature(weights):
+    """权重文件的 (修改时间, 大小)，用于发现同一路径下被覆盖的权重"""
+    st = os.stat(weights)
+    return float(st.st_mtime), int(st.st_size)
+
+
+def cache_predictions(weights, data_yaml, save_path, imgsz=416):
+    """
+    运行一次模型，保存验证集全部 NMS 前候选框（置信度 >= CACHE_CONF）与标注
+    候选框来自预测模式：按单张 letterbox 缩放，每个框只保留得分最高的类别；
+    model.val() 则按 rect 批次缩放并对多类别各保留一个框，因此离线指标与其略有差异
+    """
+    from ultralytics import YOLO
+    from ultralytics.data.utils import check_det_dataset, img2label_paths
+    from sweep import list_val_images
+
+    data = check_det_dataset(data_yaml)
+    image_files = list_val_images(data_yaml)
+    # 在推理前记录权重签名，推理期间被覆盖时下次加载会发现不一致
+    mtime, size = weights_signature(weights)
+    label_files = img2label_paths(image_files)
+
+    model = YOLO(weights, task="detect")
+    preds = {'boxes': [], 'scores': [], 'classes': [], 'image': []}
+    gts = {'boxes': [], 'classes': [], 'image': []}
+    for idx, (img_path, label_path) in enumerate(zip(image_files, label_files)):
+        # iou=1.0 时 NMS 不会抑制任何框，max_det 放大到不截断
+        r = model(img_path, imgsz=imgsz, conf=CACHE_CONF, iou=1.0, max_det=30000, verbose=False)[0]
+        data_np = r.boxes.data.cpu().numpy()
+        preds['boxes'].append(data_np[:, :4])
+        preds['scores'].append(data_np[:, 4])
+        preds['classes'].append(data_np[:, 5].astype(np.int64))
+        preds['image'].append(np.full(len(data_np), idx))
+
+        h, w = r.orig_shape
+        labels = np.zeros((0, 5), dtype=np.float32)
+        if os.path.exists(label_path):
+            labels = np.loadtxt(label_path, ndmin=2, dtype=np.float32).reshape(-1, 5)
+        cx, cy, bw, bh = labels[:, 1] * w, labels[:, 2] * h, labels[:, 3] * w, labels[:, 4] * h
+        gts['boxes'].append(np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], 1))
+        gts['classes'].append(labels[:, 0].astype(np.int64))
+        gts['image'].append(np.full(len(labels), idx))
+
+    names = data['names']
+    names = [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names)
+    np.savez_compressed(
+        save_path,
+        weights=np.array(os.path.abspath(weights)),
+        weights_mtime=np.array(mtime),
+        weights_size=np.array(size),
+        imgsz=np.array(imgsz),
+        data_yaml=np.array(os.path.abspath(data_yaml)),
+        names=np.array(names),
+        image_files=np.array(image_files),
+        boxes=np.concatenate(preds['boxes']).astype(np.float32),
+        scores=np.concatenate(preds['scores']).astype(np.float32),
+        classes=np.concatenate(preds['classes']),
+        pred_image=np.concatenate(preds['image']),
+        gt_boxes=np.concatenate(gts['boxes']).astype(np.float32),
+        gt_classes=np.concatenate(gts['classes']),
+        gt_image=np.concatenate(gts['image']),
+    )
+    print(f"已缓存 {len(image_files)} 张验证图像的预测：{save_path}")
+
+
+def _select(cache, i, conf, iou, max_det, pred_filter, gt_filter):
+    """取出第 i 张图像经过 NMS / 阈值 / 过滤后的预测与标注"""
+    keep = cache.nms_keep(iou)[i]
+    keep = keep[cache.scores[keep] >= conf][:max_det]
+    if pred_filter is not None:
+        keep = keep[pred_filter(cache.boxes[keep])]
+    gs, ge = cache.gt_offsets[i], cache.gt_offsets[i + 1]
+    gt_boxes, gt_cls = cache.gt_boxes[gs:ge], cache.gt_classes[gs:ge]
+    if gt_filter is not None:
+        mask = gt_filter(gt_boxes)
+        gt_boxes, gt_cls = gt_boxes[mask], gt_cls[mask]
+    return keep, gt_boxes, gt_cls
+
+
+def evaluate(cache, conf=CACHE_CONF, iou=0.7, max_det=300, images=None,
+             pred_filter=None, gt_filter=None):
+    """
+    离线计算指标，conf / iou / max_det 默认值与 model.val() 相同；
+    候选框的生成方式与 model.val() 不同（见 cache_predictions），mAP 以 compare_with_val 的对比为准
+    images 限定图像下标（如按场景划分），pred_filter / gt_filter 接收 xyxy 框返回布尔掩码
+    """
+    tps, confs, pred_cls, target_cls = [], [], [], []
+    for i in (range(len(cache.image_files)) if images is None else images):
+        keep, gt_boxes, gt_cls = _select(cache, i, conf, iou, max_det, pred_filter, gt_filter)
+        tps.append(match_predictions(cache.boxes[keep], cache.classes[keep], gt_boxes, gt_cls))
+        confs.append(cache.scores[keep])
+        pred_cls.append(cache.classes[keep])
+        target_cls.append(gt_cls)
+
+    tp, pred_cls, target_cls = np.concatenate(tps), np.concatenate(pred_cls), np.concatenate(target_cls)
+    stats = ap_per_class(tp, np.concatenate(confs), pred_cls, target_cls, cache.num_classes)
+    present = stats['present']
+    stats['precision'] = float(stats['p'][present].mean()) if present.any() else 0.0
+    stats['recall'] = float(stats['r'][present].mean()) if present.any() else 0.0
+    stats['map50'] = float(stats['ap'][present, 0].mean()) if present.any() else 0.0
+    stats['map50_95'] = float(stats['ap'][present].mean()) if present.any() else 0.0
+
+    # 上面的 P/R 取自 F1 曲线的最优点，与 conf 无关；这里按 IoU 0.5 直接统计 conf 阈值处的 P/R/F1
+    nc = cache.num_classes
+    tpc = np.bincount(pred_cls, weights=tp[:, 0].astype(np.float64), minlength=nc) if len(tp) else np.zeros(nc)
+    n_pred = np.bincount(pred_cls, minlength=nc)
+    n_gt = np.bincount(target_cls, minlength=nc)
+    p = np.divide(tpc, n_pred, out=np.zeros(nc), where=n_pred > 0)
+    r = np.divide(tpc, n_gt, out=np.zeros(nc), where=n_gt > 0)
+    f1 = np.divide(2 * p * r, p + r, out=np.zeros(nc), where=(p + r) > 0)
+    stats['precision_at_conf'] = float(p[present].mean()) if present.any() else 0.0
+    stats['recall_at_conf'] = float(r[present].mean()) if present.any() else 0.0
+    stats['f1_at_conf'] = float(f1[present].mean()) if present.any() else 0.0
+    return stats
+
+
+def compare_with_val(cache, weights, data_yaml, imgsz, save_path):
+    """用相同的 conf / iou 运行一次 model.val()，记录离线 mAP 与其差异"""
+    from ultralytics import YOLO
+
+    metrics = YOLO(weights, task="detect").val(data=data_yaml, imgsz=imgsz, conf=CACHE_CONF, iou=0.7,
+                                               plots=False, verbose=False)
+    stats = evaluate(cache)
+    result = {
+        'offline_map50': round(stats['map50'], 4),
+        'offline_map50_95': round(stats['map50_95'], 4),
+        'val_map50': round(float(metrics.box.map50), 4),
+        'val_map50_95': round(float(metrics.box.map), 4),
+    }
+    result['diff_map50'] = round(result['offline_map50'] - result['val_map50'], 4)
+    result['diff_map50_95'] = round(result['offline_map50_95'] - result['val_map50_95'], 4)
+    with open(save_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(result, f, sort_keys=False)
+    print(f"离线 mAP50={result['offline_map50']:.4f} mAP50-95={result['offline_map50_95']:.4f} | "
+          f"model.val() mAP50={result['val_map50']:.4f} mAP50-95={result['val_map50_95']:.4f} | "
+          f"差值 {result['diff_map50']:+.4f} / {result['diff_map50_95']:+.4f}")
+    return result
+
+
+def confusion_matrix(cache, conf=0.25, iou=0.7, match_iou=0.45, max_det=300):
+    """与 ultralytics 相同布局的混淆矩阵：行为预测类别，列为真实类别，最后一行/列为背景"""
+    nc = cache.num_classes
+    matrix = np.zeros((nc + 1, nc + 1), dtype=np.int64)
+    for i in range(len(cache.image_files)):
+        keep, gt_boxes, gt_cls = _select(cache, i, conf, iou, max_det, None, None)
+        p_cls = cache.classes[keep]
+        matched_gt = np.zeros(len(gt_cls), dtype=bool)
+        matched_pred = np.zeros(len(keep), dtype=bool)
+        if len(keep) and len(gt_cls):
+            ious = box_iou(gt_boxes, cache.boxes[keep])
+            matches = np.stack(np.nonzero(ious > match_iou), 1)
+            if len(matches):
+                matches = matches[ious[matches[:, 0], matches[:, 1]].argsort()[::-1]]
+                matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
+                matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
+                np.add.at(matrix, (p_cls[matches[:, 1]], gt_cls[matches[:, 0]]), 1)
+                matched_gt[matches[:, 0]] = True
+                matched_pred[matches[:, 1]] = True
+        np.add.at(matrix, (nc, gt_cls[~matched_gt]), 1)
+        np.add.at(matrix, (p_cls[~matched_pred], nc), 1)
+    return matrix
+
+
+def size_filter(lo, hi):
+    """按框面积开根号（像素）划分目标尺寸"""
+    def f(boxes):
+        side = np.sqrt((boxes[:, 2:] - boxes[:, :2]).prod(1))
+        return (side >= lo) & (side < hi)
+    return f
+
+
+def sweep(cache, confs, ious):
+    """置信度 / IoU 阈值网格扫描，返回每个组合的指标"""
+    rows = []
+    for iou in ious:
+        for conf in confs:
+            m = evaluate(cache, conf=conf, iou=iou)
+            rows.append({'conf': conf, 'iou': iou, 'precision': m['precision_at_conf'],
+                         'recall': m['recall_at_conf'], 'f1': m['f1_at_conf'],
+                         'map50': m['map50'], 'map50_95': m['map50_95']})
+    return rows
+
+
+def plot_curves(stats, names, save_dir):
+    """绘制 PR / F1 / P / R 曲线，命名与 runs/detect 下训练输出一致"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    x, present = stats['x'], stats['present']
+    curves = [
+        ('PR_curve.png', 'Recall', 'Precision', stats['pr_curve'], f"all classes {stats['map50']:.3f} mAP@0.5"),
+        ('F1_curve.png', 'Confidence', 'F1', stats['f1_curve'], None),
+        ('P_curve.png', 'Confidence', 'Precision', stats['p_curve'], None),
+        ('R_curve.png', 'Confidence', 'Recall', stats['r_curve'], None),
+    ]
+    for filename, xlabel, ylabel, y, mean_label in curves:
+        fig, ax = plt.subplots(figsize=(9, 6))
+        for c in np.flatnonzero(present):
+            ax.plot(x, y[c], linewidth=1, label=names[c])
+        mean = y[present].mean(0)
+        if mean_label is None:
+            mean_label = f"all classes {mean.max():.2f} at {x[mean.argmax()]:.3f}"
+        ax.plot(x, mean, linewidth=3, color='blue', label=mean_label)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.legend(bbox_to_anchor=(1.04, 1), loc='upper left')
+        fig.tight_layout()
+        fig.savefig(os.path.join(save_dir, filename), dpi=250)
+        plt.close(fig)
+
+
+def plot_confusion_matrix(matrix, names, save_dir):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    labels = list(names) + ['background']
+    for normalize in (False, True):
+        m = matrix / (matrix.sum(0, keepdims=True) + 1e-9) if normalize else matrix
+        fig, ax = plt.subplots(figsize=(12, 9))
+        im = ax.imshow(m, cmap='Blues')
+        fig.colorbar(im)
+        for (r, c), v in np.ndenumerate(m):
+            if v:
+                ax.text(c, r, f"{v:.2f}" if normalize else str(v), ha='center', va='center', fontsize=8)
+        ax.set_xticks(range(len(labels)), labels, rotation=90)
+        ax.set_yticks(range(len(labels)), labels)
+        ax.set_xlabel('True')
+        ax.set_ylabel('Predicted')
+        ax.set_title('Confusion Matrix Normalized' if normalize else 'Confusion Matrix')
+        fig.tight_layout()
+        name = 'confusion_matrix_normalized.png' if normalize else 'confusion_matrix.png'
+        fig.savefig(os.path.join(save_dir, name), dpi=250)
+        plt.close(fig)
+
+
+def main():
+    weights = "./runs/detect/yolov115/weights/best.pt"
+    data_yaml = os.path.abspath("./data/data/data.yaml")
+    deploy_config = "./deploy.yaml"
+    # 扫描的阈值，可修改
+    confs = [0.1, 0.2, 0.25, 0.3, 0.4, 0.5, 0.6]
+    ious = [0.3, 0.45, 0.5, 0.6, 0.7]
+    # 是否把 F1 最优的阈值写入部署配置，供 pred.py 使用
+    update_deploy = False
+
+    # 缓存与 pred.py 使用相同的权重和输入尺寸
+    config = {'weights': weights, 'imgsz': 416}
+    if os.path.exists(deploy_config):
+        with open(deploy_config, 'r', encoding='utf-8') as f:
+            config.update(yaml.safe_load(f) or {})
+    # 输出目录按训练名、权重文件与输入尺寸区分，如 runs/eval/yolov115_best.pt_416
+    run_name = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(config['weights']))))
+    save_dir = os.path.join("./runs/eval", f"{run_name}_{os.path.basename(config['weights'])}_{config['imgsz']}")
+    cache_path = os.path.join(save_dir, "predictions.npz")
+    os.makedirs(save_dir, exist_ok=True)
+
+    # 只有缓存不存在或与当前权重、数据集不符时才需要运行模型
+    from sweep import list_val_images
+    image_files = list_val_images(data_yaml)
+    try:
+        cache = PredictionCache(cache_path, config['weights'], config['imgsz'], data_yaml, image_files)
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        if os.path.exists(cache_path):
+            print(f"缓存已失效，重新生成：{e}")
+        cache_predictions(config['weights'], data_yaml, cache_path, config['imgsz'])
+        cache = PredictionCache(cache_path, config['weights'], config['imgsz'], data_yaml, image_files)
+        # 离线评估与 model.val() 的候选框生成方式不同，新缓存生成时对比一次 mAP
+        compare_with_val(cache, config['weights'], data_yaml, config['imgsz'],
+                         os.path.join(save_dir, "val_compare.yaml"))
+
+    start = time.perf_counter()
+    stats = evaluate(cache)
+    print(f"P={stats['precision']:.4f} R={stats['recall']:.4f} "
+          f"mAP50={stats['map50']:.4f} mAP50-95={stats['map50_95']:.4f} "
+          f"({time.perf_counter() - start:.2f}s)")
+    plot_curves(stats, cache.names, save_dir)
+    plot_confusion_matrix(confusion_matrix(cache), cache.names, save_dir)
+
+    print("\n按目标尺寸:")
+    for name, lo, hi in (('small', 0, 32), ('medium', 32, 96), ('large', 96, np.inf)):
+        f = size_filter(lo, hi)
+        m = evaluate(cache, pred_filter=f, gt_filter=f)
+        print(f"{name:>7}: mAP50={m['map50']:.4f} mAP50-95={m['map50_95']:.4f}")
+
+    start = time.perf_counter()
+    rows = sweep(cache, confs, ious)
+    print(f"\n阈值扫描 ({len(rows)} 组, {time.perf_counter() - start:.1f}s):")
+    print(f"{'conf':>6} {'iou':>6} {'P':>7} {'R':>7} {'F1':>7} {'mAP50':>7} {'mAP50-95':>9}")
+    for r in rows:
+        print(f"{r['conf']:>6.2f} {r['iou']:>6.2f} {r['precision']:>7.4f} {r['recall']:>7.4f} "
+              f"{r['f1']:>7.4f} {r['map50']:>7.4f} {r['map50_95']:>9.4f}")
+    best = max(rows, key=lambda r: r['f1'])
+    print(f"\nF1 最优: conf={best['conf']} iou={best['iou']} F1={best['f1']:.4f}")
+
+    if update_deploy:
+        config.update({'conf': best['conf'], 'iou': best['iou']})
+        with open(deploy_config, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+        print(f"已写入 {deploy_config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,9 @@ from PIL import Image, ImageTk, ImageEnhance, ImageOps
 import cv2
 import numpy as np
 import os
+import queue
 
-from pred import pred
+from pred import pred, manager, pool_submit, pool_collect, pool_pending, pool_drain, PIPELINE_DEPTH
 
 # 颜色主题
 BG_COLOR = "#f0f0f0"
@@ -144,8 +145,13 @@ class RadarCrackDetectionApp:
         self.load_video_btn = StyledButton(btn_frame, text="加载视频", command=self.load_video)
         self.start_cam_btn = StyledButton(btn_frame, text="启动摄像头", command=self.start_camera)
         self.stop_cam_btn = StyledButton(btn_frame, text="停止摄像头", command=self.stop_camera, state=tk.DISABLED)
+        self.reload_model_btn = StyledButton(btn_frame, text="切换模型", command=self.reload_model)
+        if manager is None:
+            # 推理池模式下模型由子进程持有，不支持热切换
+            self.reload_model_btn['state'] = tk.DISABLED
 
-        for btn in [self.load_img_btn, self.load_video_btn, self.start_cam_btn, self.stop_cam_btn]:
+        for btn in [self.load_img_btn, self.load_video_btn, self.start_cam_btn, self.stop_cam_btn,
+                    self.reload_model_btn]:
             btn.pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
 
         # 图像处理控制区
@@ -335,12 +341,65 @@ class RadarCrackDetectionApp:
         """停止视频/摄像头"""
         if self.cap:
             self.cap.release()
+        if manager is None:
+            try:
+                pool_drain()
+            except Exception as e:
+                print(f"清空推理流水线失败: {e}")
         self.running = False
         self.stop_cam_btn['state'] = tk.DISABLED
         self.status_bar['text'] = "已停止视频输入"
 
+    def reload_model(self):
+        """后台加载新模型，视频不中断"""
+        file_path = filedialog.askopenfilename(
+            title="选择模型权重",
+            filetypes=[("PyTorch 权重", "*.pt"), ("所有文件", "*.*")]
+        )
+        if file_path:
+            self.reload_model_btn['state'] = tk.DISABLED
+            self.status_bar['text'] = f"正在后台加载模型: {file_path}"
+            # 回调在加载线程中执行，只把结果放入队列，由主线程轮询后更新界面
+            self.reload_queue = queue.Queue()
+            manager.reload(file_path, on_done=self.reload_queue.put)
+            self.root.after(100, self.poll_model_reload)
+
+    def poll_model_reload(self):
+        """在主线程中轮询模型切换结果"""
+        try:
+            stats = self.reload_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.poll_model_reload)
+            return
+        self.on_model_reloaded(stats)
+
+    def on_model_reloaded(self, stats):
+        """模型切换完成后的状态提示"""
+        self.reload_model_btn['state'] = tk.NORMAL
+        if stats["swapped"]:
+            self.status_bar['text'] = (f"模型已切换: {stats['weights']} "
+                                       f"(加载 {stats['load_s']:.2f}s, 切换 {stats['swap_latency_ms']:.3f}ms)")
+            self.root.after(100, self.poll_swap_frame_gap, stats)
+        else:
+            self.status_bar['text'] = f"模型切换失败，已回滚: {stats['smoke']}"
+
+    def poll_swap_frame_gap(self, stats):
+        """新模型处理完第一帧后，在状态栏补充切换前后的帧间隔"""
+        if stats is not manager.last_stats:
+            # 期间又发生了新的切换，由新的轮询负责显示
+            return
+        if not manager.swap_settled.is_set():
+            self.root.after(100, self.poll_swap_frame_gap, stats)
+            return
+        self.status_bar['text'] = (f"模型已切换: {stats['weights']} "
+                                   f"(加载 {stats['load_s']:.2f}s, 切换 {stats['swap_latency_ms']:.3f}ms, "
+                                   f"切换帧间隔 {stats['frame_gap_ms']:.1f}ms / 平均 {stats['mean_frame_ms']:.1f}ms)")
+
     def update_video_frame(self):
         """更新视频帧"""
+        if manager is None:
+            self.update_video_frame_pipelined()
+            return
         if self.running and self.cap:
             ret, frame = self.cap.read()
             if ret:
@@ -350,6 +409,32 @@ class RadarCrackDetectionApp:
                 self.stop_camera()
                 self.status_bar['text'] = "视频播放结束"
 
+    def update_video_frame_pipelined(self):
+        """推理池模式：保持多帧在途，绘制第 k 帧时后续帧已在推理进程中处理"""
+        if not (self.running and self.cap):
+            return
+        ended = False
+        try:
+            while pool_pending() < PIPELINE_DEPTH:
+                ret, frame = self.cap.read()
+                if not ret:
+                    ended = True
+                    break
+                pool_submit(frame)
+            if pool_pending():
+                self.show_results(*pool_collect())
+        except Exception as e:
+            self.stop_camera()
+            self.status_bar['text'] = f"处理错误: {str(e)}"
+            self.clear_display()
+            return
+
+        if ended and not pool_pending():
+            self.stop_camera()
+            self.status_bar['text'] = "视频播放结束"
+        else:
+            self.root.after(1, self.update_video_frame_pipelined)
+
     def process_and_display(self, frame, is_stream):
         """处理并显示图像"""
         try:
@@ -359,32 +444,35 @@ class RadarCrackDetectionApp:
 
             # 执行预测
             orig, processed = pred(frame, stream=is_stream)
+            self.show_results(orig, processed)
 
-            # 转换颜色空间
-            orig = self.convert_color_space(orig)
-            processed = self.convert_color_space(processed)
+        except Exception as e:
+            self.status_bar['text'] = f"处理错误: {str(e)}"
+            self.clear_display()
 
-            # 转换为PIL图像
-            orig_pil = Image.fromarray(orig)
-            processed_pil = Image.fromarray(processed)
+    def show_results(self, orig, processed):
+        """显示原图与检测结果"""
+        # 转换颜色空间
+        orig = self.convert_color_space(orig)
+        processed = self.convert_color_space(processed)
 
-            # 调整显示尺寸
-            orig_display = self.resize_for_display(orig_pil)
-            processed_display = self.resize_for_display(processed_pil)
+        # 转换为PIL图像
+        orig_pil = Image.fromarray(orig)
+        processed_pil = Image.fromarray(processed)
 
-            # 更新显示
-            self.update_image_display(orig_display, processed_display)
+        # 调整显示尺寸
+        orig_display = self.resize_for_display(orig_pil)
+        processed_display = self.resize_for_display(processed_pil)
 
-            # 保存最后显示的图像
-            self.last_orig = orig_display
-            self.last_processed = processed_display
+        # 更新显示
+        self.update_image_display(orig_display, processed_display)
 
-            # 释放资源
-            del orig, processed, orig_pil, processed_pil
+        # 保存最后显示的图像
+        self.last_orig = orig_display
+        self.last_processed = processed_display
 
-        except Exception as e:
-            self.status_bar['text'] = f"处理错误: {str(e)}"
-            self.clear_display()
+        # 释放资源
+        del orig, processed, orig_pil, processed_pil
 
     def apply_image_processing(self, operation):
         """应用图像处理操作"""
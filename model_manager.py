@@ -0,0 +1,220 @@
+import os
+import time
+import threading
+import numpy as np
+import cv2
+from glob import glob
+from ultralytics import YOLO
+
+
+class ModelManager:
+    """
+    推理模型管理器：后台加载与预热新权重，冒烟测试通过后在帧与帧之间原子切换
+    正在推理的帧继续使用切换前取到的模型，因此切换过程不会丢帧
+    """
+
+    def __init__(self, weights, imgsz=416, half=False, conf=0.25, iou=0.7, smoke_dir="./test",
+                 warmup_runs=3, min_detect_ratio=0.5):
+        self.imgsz = imgsz
+        self.half = half
+        # 推理与冒烟测试使用相同的阈值
+        self.conf = conf
+        self.iou = iou
+        self.smoke_dir = smoke_dir
+        self.warmup_runs = warmup_runs
+        # 新模型在冒烟测试图像上的检测数不得低于当前模型的该比例
+        self.min_detect_ratio = min_detect_ratio
+
+        # _lock 保证 (模型, 权重, 版本) 三者一致；_reload_lock 保证同一时间只有一次切换
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watch_thread = None
+
+        self.model = self._load(weights)
+        self._baseline_count = self._count_detections(self.model, self._smoke_images())
+        self.weights = weights
+        self.version = 0
+        self.previous = None
+        self.last_stats = None
+
+        # 帧时间记录，用于统计切换前后的帧间隔
+        self._last_frame_time = None
+        self._frame_intervals = []
+        self._pending_swap = None
+        # 切换后新模型处理完第一帧（frame_gap_ms 已填入）时置位，可用 wait() 等待
+        self.swap_settled = threading.Event()
+        self.swap_settled.set()
+
+    def _load(self, weights):
+        model = YOLO(weights, task="detect")
+        blank = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(self.warmup_runs):
+            model(blank, imgsz=self.imgsz, half=self.half, verbose=False)
+        return model
+
+    def _smoke_images(self):
+        paths = sorted(glob(os.path.join(self.smoke_dir, "*.jpg")))
+        return [img for img in (cv2.imread(p) for p in paths) if img is not None]
+
+    def _count_detections(self, model, images):
+        total = 0
+        for img in images:
+            for r in model(img, imgsz=self.imgsz, half=self.half, conf=self.conf, iou=self.iou,
+                           verbose=False):
+                total += len(r.boxes)
+        return total
+
+    def smoke_test(self, candidate):
+        """
+        在 test/ 图像上对比新旧模型的检测数，返回 (是否通过, 检测数, 说明)
+        当前模型的检测数在其上线前已统计好，避免在后台线程中与推理共用同一模型
+        """
+        images = self._smoke_images()
+        if not images:
+            return True, 0, "没有冒烟测试图像，跳过"
+        try:
+            count = self._count_detections(candidate, images)
+        except Exception as e:
+            return False, 0, f"推理出错: {e}"
+        if count == 0 or count < self._baseline_count * self.min_detect_ratio:
+            return False, count, f"检测数过低: {count} (当前模型 {self._baseline_count})"
+        return True, count, f"检测数 {count} (当前模型 {self._baseline_count})"
+
+    def predict(self, img, **kwargs):
+        """取当前模型完成一帧推理，结果以列表返回"""
+        with self._lock:
+            model, version = self.model, self.version
+        kwargs = {"conf": self.conf, "iou": self.iou, **kwargs}
+        results = list(model(img, imgsz=self.imgsz, half=self.half, **kwargs))
+        self._record_frame(version)
+        return results
+
+    def _record_frame(self, version):
+        now = time.perf_counter()
+        with self._lock:
+            if self._last_frame_time is not None:
+                interval = now - self._last_frame_time
+                self._frame_intervals = (self._frame_intervals + [interval])[-100:]
+                # 新版本的第一帧：记录与上一帧之间的间隔
+                pending = self._pending_swap
+                if pending is not None and version == pending["version"]:
+                    pending["frame_gap_ms"] = interval * 1000
+                    pending["mean_frame_ms"] = float(np.mean(self._frame_intervals[:-1] or [interval])) * 1000
+                    self._pending_swap = None
+                    self.swap_settled.set()
+            self._last_frame_time = now
+
+    def reload(self, weights, block=False, on_done=None):
+        """加载新权重；block=False 时在后台线程中完成，on_done 接收统计信息"""
+        if block:
+            return self._reload(weights, on_done)
+        thread = threading.Thread(target=self._reload, args=(weights, on_done), daemon=True)
+        thread.start()
+        return thread
+
+    def _reload(self, weights, on_done=None):
+        with self._reload_lock:
+            stats = {"weights": weights, "swapped": False}
+            try:
+                start = time.perf_counter()
+                candidate = self._load(weights)
+                stats["load_s"] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                ok, count, message = self.smoke_test(candidate)
+                stats["smoke_s"] = time.perf_counter() - start
+                stats["smoke"] = message
+            except Exception as e:
+                ok, stats["smoke"] = False, f"加载失败: {e}"
+
+            if ok:
+                self._swap(candidate, weights, count, stats)
+                print(f"模型已切换: {weights} (加载 {stats['load_s']:.2f}s, "
+                      f"冒烟测试 {stats['smoke_s']:.2f}s, 切换 {stats['swap_latency_ms']:.3f}ms)")
+            else:
+                print(f"模型切换已回滚，继续使用 {self.weights}: {stats['smoke']}")
+
+            self.last_stats = stats
+            if on_done is not None:
+                on_done(stats)
+            return stats
+
+    def _swap(self, model, weights, count, stats):
+        start = time.perf_counter()
+        with self._lock:
+            self.previous = (self.model, self.weights, self._baseline_count)
+            self.model, self.weights, self._baseline_count = model, weights, count
+            self.version += 1
+            stats["version"] = self.version
+            stats["swapped"] = True
+            # frame_gap_ms 在新模型处理完第一帧后填入
+            self._pending_swap = stats
+            self.swap_settled.clear()
+        stats["swap_latency_ms"] = (time.perf_counter() - start) * 1000
+
+    def rollback(self):
+        """手动回退到上一个模型"""
+        with self._lock:
+            if self.previous is None:
+                return False
+            current = (self.model, self.weights, self._baseline_count)
+            self.model, self.weights, self._baseline_count = self.previous
+            self.previous = current
+            self.version += 1
+        print(f"已回退到 {self.weights}")
+        return True
+
+    def watch(self, weights_dir, interval=5.0):
+        """轮询 weights_dir 下最新的 best.pt，文件写入稳定后自动加载"""
+        def newest():
+            paths = glob(os.path.join(weights_dir, "**", "best.pt"), recursive=True)
+            return max(((os.path.getmtime(p), p) for p in paths), default=None)
+
+        def loop():
+            seen = newest()
+            candidate = None
+            while not self._stop.wait(interval):
+                latest = newest()
+                if latest is None or latest == seen:
+                    candidate = None
+                    continue
+                # 连续两次轮询修改时间不变，视为训练已写完该文件
+                if latest == candidate:
+                    seen, candidate = latest, None
+                    self._reload(latest[1])
+                else:
+                    candidate = latest
+
+        self._stop.clear()
+        self._watch_thread = threading.Thread(target=loop, daemon=True)
+        self._watch_thread.start()
+        return self._watch_thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    # 模拟视频流：循环推理 test/ 图像的同时切换到新的权重，统计切换延迟与帧间隔
+    current = "./runs/detect/yolov115/weights/best.pt"
+    new = "./runs/detect/yolov116/weights/best.pt"
+    frames = [cv2.imread(p) for p in sorted(glob("./test/*.jpg"))]
+
+    manager = ModelManager(current)
+    done = threading.Event()
+    manager.reload(new, on_done=lambda stats: done.set())
+
+    count = 0
+    while not done.is_set() or not manager.swap_settled.is_set():
+        manager.predict(frames[count % len(frames)], verbose=False)
+        count += 1
+
+    stats = manager.last_stats
+    print(f"切换期间共处理 {count} 帧")
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
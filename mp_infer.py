@@ -0,0 +1,263 @@
+import os
+import gc
+import time
+import queue
+import threading
+import yaml
+import numpy as np
+import cv2
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from glob import glob
+
+
+# 单个检测结果的结构化类型，回传主进程时只有几十字节
+DET_DTYPE = np.dtype([
+    ('x1', 'f4'), ('y1', 'f4'), ('x2', 'f4'), ('y2', 'f4'),
+    ('conf', 'f4'), ('cls', 'i2'),
+])
+
+
+class FrameRing:
+    """
+    共享内存中的预分配帧槽位，每个槽位可容纳一张 max_shape 大小的 BGR 图像
+    帧按实际尺寸连续存放在槽位开头，读取时直接构造视图，无需复制或序列化
+    """
+
+    def __init__(self, num_slots, max_shape, name=None):
+        self.num_slots = num_slots
+        self.max_shape = tuple(max_shape)
+        self.slot_bytes = int(np.prod(self.max_shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=num_slots * self.slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.buffer = np.ndarray((num_slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, frame):
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"帧尺寸 {frame.shape} 超过槽位上限 {self.max_shape}")
+        self.buffer[slot, :frame.nbytes] = frame.reshape(-1)
+        return frame.shape
+
+    def view(self, slot, shape):
+        return self.buffer[slot, :int(np.prod(shape))].reshape(shape)
+
+    def close(self, unlink=False):
+        # 先释放视图，否则共享内存无法关闭
+        self.buffer = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def to_detections(boxes):
+    """把 ultralytics 的 Boxes 转换为 DET_DTYPE 结构化数组"""
+    data = boxes.data.cpu().numpy()
+    dets = np.empty(len(data), dtype=DET_DTYPE)
+    for i, key in enumerate(DET_DTYPE.names):
+        dets[key] = data[:, i]
+    return dets
+
+
+def _detect(model, frame, imgsz, half, conf, iou):
+    """单帧推理，结果以 DET_DTYPE 结构化数组返回"""
+    return to_detections(model(frame, imgsz=imgsz, half=half, conf=conf, iou=iou, verbose=False)[0].boxes)
+
+
+def _worker(weights, ring_args, task_q, free_q, result_q, threads, imgsz, half, conf, iou):
+    """推理进程：从共享内存读取帧，推理后把槽位归还并回传检测结果"""
+    # spawn 子进程会先重新导入主模块（如 gui.py -> pred -> torch），此处再设环境变量已经无效；
+    # OMP_NUM_THREADS 由主进程在启动子进程时传入，这里用 set_num_threads 限制 torch 线程数
+    try:
+        import torch
+        from ultralytics import YOLO
+
+        torch.set_num_threads(threads)
+        cv2.setNumThreads(1)
+
+        ring = FrameRing(*ring_args)
+        model = YOLO(weights, task="detect")
+    except Exception as e:
+        # 把启动失败的原因交给主进程，避免主进程一直等待
+        result_q.put(("error", f"{type(e).__name__}: {e}"))
+        return
+    result_q.put(("ready", None))
+
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        frame_id, slot, shape = task
+        try:
+            dets = _detect(model, ring.view(slot, shape), imgsz, half, conf, iou)
+        except Exception as e:
+            # 单帧失败不能让进程退出，否则槽位无法归还、调用方会一直等待；该帧返回空结果
+            print(f"推理进程处理第 {frame_id} 帧出错: {type(e).__name__}: {e}")
+            dets = np.empty(0, dtype=DET_DTYPE)
+        finally:
+            # 推理已结束，槽位可以立即复用
+            free_q.put(slot)
+        result_q.put((frame_id, dets))
+
+    # 模型内部仍引用最后一帧的共享内存视图，需先释放
+    del model
+    gc.collect()
+    try:
+        ring.close()
+    except BufferError:
+        # 仍有残留引用时交由进程退出释放映射，不影响主进程 unlink
+        pass
+
+
+class InferencePool:
+    """多进程推理池：帧经共享内存环形缓冲区传给各推理进程，结果可能乱序返回"""
+
+    def __init__(self, weights, num_workers=2, threads_per_worker=None, num_slots=None,
+                 max_shape=(1080, 1920, 3), imgsz=416, half=False, conf=0.25, iou=0.7,
+                 start_timeout=120):
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // num_workers)
+        if num_slots is None:
+            num_slots = num_workers * 2
+
+        ctx = mp.get_context("spawn")
+        self.ring = FrameRing(num_slots, max_shape)
+        self.task_q = ctx.Queue()
+        self.free_q = ctx.Queue()
+        self.result_q = ctx.Queue()
+        for slot in range(num_slots):
+            self.free_q.put(slot)
+
+        self.workers = [
+            ctx.Process(
+                target=_worker,
+                args=(weights, (num_slots, max_shape, self.ring.name), self.task_q, self.free_q,
+                      self.result_q, threads_per_worker, imgsz, half, conf, iou),
+                daemon=True,
+            )
+            for _ in range(num_workers)
+        ]
+        # 子进程启动时会先导入 torch，线程数环境变量必须在 spawn 之前设置，启动后恢复
+        old_threads = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+        try:
+            for w in self.workers:
+                w.start()
+        finally:
+            if old_threads is None:
+                os.environ.pop("OMP_NUM_THREADS", None)
+            else:
+                os.environ["OMP_NUM_THREADS"] = old_threads
+        self._next_id = 0
+        try:
+            self._wait_ready(start_timeout)
+        except Exception:
+            self._terminate()
+            raise
+
+    def _poll_result(self, timeout):
+        """从结果队列取一项；等待期间有进程退出或超时时抛出 RuntimeError / TimeoutError"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.result_q.get(timeout=1.0)
+            except queue.Empty:
+                dead = [w for w in self.workers if not w.is_alive()]
+                if dead:
+                    raise RuntimeError(f"推理进程意外退出，退出码 {dead[0].exitcode}")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"推理进程在 {timeout}s 内没有返回结果")
+
+    def _wait_ready(self, timeout):
+        """等待所有进程加载完模型；进程报错、意外退出或超时时抛出异常"""
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < len(self.workers):
+            status, message = self._poll_result(max(0.0, deadline - time.monotonic()))
+            if status == "error":
+                raise RuntimeError(f"推理进程启动失败: {message}")
+            ready += 1
+
+    def _terminate(self):
+        for w in self.workers:
+            if w.is_alive():
+                w.terminate()
+            w.join()
+        self.ring.close(unlink=True)
+
+    def submit(self, frame):
+        """写入一个空闲槽位并派发任务；槽位用尽时阻塞，形成背压。返回帧编号"""
+        slot = self.free_q.get()
+        shape = self.ring.write(slot, frame)
+        frame_id = self._next_id
+        self._next_id += 1
+        self.task_q.put((frame_id, slot, shape))
+        return frame_id
+
+    def get(self, timeout=None):
+        """取回一个结果 (帧编号, 检测结构化数组)；进程意外退出时抛出 RuntimeError，超时抛出 TimeoutError"""
+        return self._poll_result(timeout)
+
+    def close(self):
+        for _ in self.workers:
+            self.task_q.put(None)
+        for w in self.workers:
+            w.join()
+        self.ring.close(unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(weights, frames, worker_counts, total=300, imgsz=416, half=False):
+    """不同进程数下的吞吐量（帧/秒）"""
+    max_shape = (max(f.shape[0] for f in frames), max(f.shape[1] for f in frames), 3)
+    results = {}
+    for n in worker_counts:
+        with InferencePool(weights, num_workers=n, max_shape=max_shape, imgsz=imgsz, half=half) as pool:
+            # 预热每个进程
+            for i in range(n * 2):
+                pool.submit(frames[i % len(frames)])
+            for _ in range(n * 2):
+                pool.get()
+
+            # 独立线程持续送帧，主线程收结果
+            def feed():
+                for i in range(total):
+                    pool.submit(frames[i % len(frames)])
+
+            feeder = threading.Thread(target=feed)
+            start = time.perf_counter()
+            feeder.start()
+            for _ in range(total):
+                pool.get()
+            elapsed = time.perf_counter() - start
+            feeder.join()
+        results[n] = total / elapsed
+        print(f"{n} 个进程: {results[n]:.1f} FPS (加速比 {results[n] / results[worker_counts[0]]:.2f}x)")
+    return results
+
+
+def main():
+    # 与 pred.py 使用相同的部署配置
+    config = {'weights': "./runs/detect/yolov115/weights/best.pt", 'imgsz': 416, 'half': False}
+    if os.path.exists("./deploy.yaml"):
+        with open("./deploy.yaml", 'r', encoding='utf-8') as f:
+            config.update(yaml.safe_load(f) or {})
+    frames = [cv2.imread(p) for p in sorted(glob("./test/*.jpg"))]
+    # 测试的进程数，可修改
+    cpu = os.cpu_count() or 1
+    worker_counts = [n for n in (1, 2, 4, 8) if n <= cpu]
+    benchmark(config['weights'], frames, worker_counts, imgsz=config['imgsz'], half=config['half'])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import numpy as np
-from ultralytics import YOLO
 import cv2
 import math
+import os
+import atexit
+import yaml
+from collections import deque
+
+from model_manager import ModelManager
+from mp_infer import InferencePool, to_detections
 
 # 设置字体样式
 font = cv2.FONT_HERSHEY_DUPLEX
@@ -55,58 +61,158 @@ def get_optimal_font_scale(text, width):
     return 1
 
 
-# 加载YOLO模型
-model = YOLO("./runs/detect/yolov115/weights/best.pt")
+# 部署配置，由 sweep.py 选出的工作点与 evaluate.py 选出的阈值写入；不存在时使用训练时的默认设置
+DEPLOY_CONFIG = "./deploy.yaml"
+
+
+def load_deploy_config(path=DEPLOY_CONFIG):
+    config = {
+        "weights": "./runs/detect/yolov115/weights/best.pt",
+        "imgsz": 416,
+        "half": False,
+        "conf": 0.25,
+        "iou": 0.7,
+        # 大于 0 时使用多进程推理池，推理不再与绘制、界面更新争抢 GIL
+        "workers": 0,
+    }
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(yaml.safe_load(f) or {})
+    return config
+
+
+deploy = load_deploy_config()
+
+# 加载YOLO模型：单进程模式由管理器负责热切换；推理池模式在首次预测时启动，
+# 避免 spawn 子进程重新导入本模块时再次创建推理池
+if deploy["workers"] > 0:
+    manager = None
+else:
+    manager = ModelManager(deploy["weights"], imgsz=deploy["imgsz"], half=deploy["half"],
+                           conf=deploy["conf"], iou=deploy["iou"])
+pool = None
+
+# 推理池共享内存槽位可容纳的最大帧尺寸，更大的帧缩小后送入
+POOL_MAX_SHAPE = (1080, 1920, 3)
+# 视频流水线深度：比进程数多一帧，主进程绘制时每个推理进程都有帧可处理
+PIPELINE_DEPTH = deploy["workers"] + 1
+# 等待单帧结果的超时（秒）
+POOL_TIMEOUT = 30
+
+# 已提交、尚未取回的帧 (帧编号, 原图, 缩放比例)，按提交顺序排列
+_in_flight = deque()
+# 先于更早帧到达的结果，按帧编号暂存
+_early_results = {}
 
 # 定义类别名称
 classNames = ['Car', 'Car', 'Car', 'Car', 'Car']
 
 
+def get_pool():
+    global pool
+    if pool is None:
+        pool = InferencePool(deploy["weights"], num_workers=deploy["workers"], max_shape=POOL_MAX_SHAPE,
+                             imgsz=deploy["imgsz"], half=deploy["half"], conf=deploy["conf"], iou=deploy["iou"])
+        atexit.register(pool.close)
+    return pool
+
+
+def pool_submit(img):
+    """把一帧送入推理池，不等待结果；返回帧编号"""
+    h, w = img.shape[:2]
+    scale = min(1.0, POOL_MAX_SHAPE[0] / h, POOL_MAX_SHAPE[1] / w)
+    frame = img if scale == 1.0 else cv2.resize(img, (int(w * scale), int(h * scale)))
+    frame_id = get_pool().submit(frame)
+    _in_flight.append((frame_id, img, scale))
+    return frame_id
+
+
+def _wait_result(frame_id):
+    # 多个进程并行时结果可能乱序到达，按帧编号匹配
+    while frame_id not in _early_results:
+        result_id, dets = get_pool().get(timeout=POOL_TIMEOUT)
+        _early_results[result_id] = dets
+    return _early_results.pop(frame_id)
+
+
+def pool_collect():
+    """取回最早提交的一帧并绘制检测结果，返回 (原图, 结果图)"""
+    frame_id, img, scale = _in_flight.popleft()
+    dets = _wait_result(frame_id)
+    if scale != 1.0:
+        for key in ('x1', 'y1', 'x2', 'y2'):
+            dets[key] /= scale
+    orig = img.copy()
+    draw_detections(img, dets)
+    return orig, img
+
+
+def pool_pending():
+    """在途帧数"""
+    return len(_in_flight)
+
+
+def pool_drain():
+    """丢弃所有在途帧（停止视频时调用，避免旧帧混入下一段视频）"""
+    while _in_flight:
+        _wait_result(_in_flight.popleft()[0])
+
+
+# 在图像上绘制 DET_DTYPE 检测结果
+def draw_detections(img, dets):
+    for det in dets:
+        # 获取边界框的坐标
+        x1, y1, x2, y2 = int(det['x1']), int(det['y1']), int(det['x2']), int(det['y2'])
+        w, h = x2 - x1, y2 - y1
+
+        # 获取置信度并进行四舍五入
+        conf = math.ceil((det['conf'] * 100)) / 100
+
+        # 获取类别索引并转换为类别名称
+        name = classNames[int(det['cls'])]
+        print(f"{name} " f"{conf}")
+
+        # 获取适合文本的最优字体大小
+        #font_scale = get_optimal_font_scale(f"{name} {conf}", w)
+        thick = 1 if w < 210 else 2
+
+        # 根据类别名称选择颜色并绘制边界框和文本
+        cv2.rectangle(
+            img=img,
+            pt1=(x1, y1),
+            pt2=(x1 + w, y1 + h),
+            color=(0, 102, 255), #bgr
+            thickness=2,
+        )
+        add_text_with_background(
+            img,
+            f"{name} {conf}",
+            (x1, y1),
+            font,
+            1.1,
+            (255, 255, 255),
+            (0, 102, 255), #bgr
+            thick,
+            5,
+        )
+    return img
+
+
 # 进行预测
 def pred(img, stream=False):
     orig = img.copy()
 
+    if manager is None:
+        # 推理池模式：推理在子进程中完成，本进程只负责绘制；
+        # 单张调用是同步的，视频请用 pool_submit / pool_collect 组成流水线以利用多个进程
+        pool_drain()
+        pool_submit(img)
+        return pool_collect()
+
     # 使用YOLO模型进行预测
-    results = model(img, stream=stream)
+    results = manager.predict(img, stream=stream)
     for r in results:
-        boxes = r.boxes
-        for box in boxes:
-            # 获取边界框的坐标
-            x1, y1, x2, y2 = box.xyxy[0]
-            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-            w, h = x2 - x1, y2 - y1
-
-            # 获取置信度并进行四舍五入
-            conf = math.ceil((box.conf[0] * 100)) / 100
-
-            # 获取类别索引并转换为类别名称
-            cls = box.cls[0]
-            name = classNames[int(cls)]
-            print(f"{name} " f"{conf}")
-
-            # 获取适合文本的最优字体大小
-            #font_scale = get_optimal_font_scale(f"{name} {conf}", w)
-            thick = 1 if w < 210 else 2
-
-            # 根据类别名称选择颜色并绘制边界框和文本
-            cv2.rectangle(
-                img=img,
-                pt1=(x1, y1),
-                pt2=(x1 + w, y1 + h),
-                color=(0, 102, 255), #bgr
-                thickness=2,
-            )
-            add_text_with_background(
-                img,
-                f"{name} {conf}",
-                (x1, y1),
-                font,
-                1.1,
-                (255, 255, 255),
-                (0, 102, 255), #bgr
-                thick,
-                5,
-            )
+        draw_detections(img, to_detections(r.boxes))
     return orig, img
 
 
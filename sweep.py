@@ -0,0 +1,194 @@
+import os
+import csv
+import time
+import shutil
+import yaml
+import numpy as np
+import cv2
+from ultralytics import YOLO
+from ultralytics.data.utils import check_det_dataset
+
+from data_enhance.dedup import list_images
+
+
+# 各推理后端：fp32 / half 直接使用 .pt 权重，其余为导出格式
+BACKENDS = {
+    'fp32': {'format': None, 'half': False},
+    'half': {'format': None, 'half': True},
+    'onnx': {'format': 'onnx', 'half': False},
+    'openvino': {'format': 'openvino', 'half': False},
+}
+
+
+def export_weights(weights, fmt, imgsz):
+    """导出指定尺寸的模型，并按尺寸重命名，避免不同尺寸的导出结果相互覆盖"""
+    exported = YOLO(weights).export(format=fmt, imgsz=imgsz)
+    stem, ext = os.path.splitext(weights)
+    if fmt == 'openvino':
+        # ultralytics 依靠 "_openvino_model" 目录后缀识别 OpenVINO 模型
+        target = f"{stem}_{imgsz}_openvino_model"
+    else:
+        target = f"{stem}_{imgsz}{os.path.splitext(exported)[1]}"
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    elif os.path.exists(target):
+        os.remove(target)
+    shutil.move(exported, target)
+    return target
+
+
+def list_val_images(data_yaml, limit=None):
+    """读取数据集配置中的验证集图像列表，支持目录与 txt 列表；找不到图像时报错"""
+    val = check_det_dataset(data_yaml)['val']
+    paths = sorted(list_images(val))
+    if not paths:
+        raise FileNotFoundError(f"验证集中没有找到图像：{val}")
+    return paths[:limit] if limit else paths
+
+
+def measure_latency(model, images, imgsz, half, device, warmup=5):
+    """逐张推理测量延迟（毫秒），返回 (平均, P95, 吞吐 FPS)"""
+    frames = [cv2.imread(p) for p in images]
+    for frame in frames[:warmup]:
+        model(frame, imgsz=imgsz, half=half, device=device, verbose=False)
+
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        model(frame, imgsz=imgsz, half=half, device=device, verbose=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    return float(latencies.mean()), float(np.percentile(latencies, 95)), float(1000 / latencies.mean())
+
+
+def pareto_frontier(rows):
+    """延迟越低越好、mAP50-95 越高越好，返回按延迟升序的非支配点"""
+    frontier = []
+    best_map = -1.0
+    for row in sorted(rows, key=lambda r: (r['latency_ms'], -r['map50_95'])):
+        if row['map50_95'] > best_map:
+            frontier.append(row)
+            best_map = row['map50_95']
+    return frontier
+
+
+def choose_operating_point(frontier, tolerance=0.01):
+    """在 mAP50-95 不低于最优值 tolerance 的前提下选择延迟最低的点"""
+    best_map = max(r['map50_95'] for r in frontier)
+    return next(r for r in frontier if r['map50_95'] >= best_map - tolerance)
+
+
+def plot_frontier(rows, frontier, save_path):
+    """绘制延迟-精度散点图并连接帕累托前沿"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    for backend in BACKENDS:
+        pts = [r for r in rows if r['backend'] == backend]
+        if pts:
+            ax.scatter([r['latency_ms'] for r in pts], [r['map50_95'] for r in pts], label=backend)
+            for r in pts:
+                ax.annotate(str(r['imgsz']), (r['latency_ms'], r['map50_95']),
+                            textcoords='offset points', xytext=(4, 4), fontsize=8)
+    ax.plot([r['latency_ms'] for r in frontier], [r['map50_95'] for r in frontier],
+            'k--', linewidth=1, label='Pareto')
+    ax.set_xlabel('CPU latency (ms / image)')
+    ax.set_ylabel('mAP50-95')
+    ax.grid(alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(save_path, dpi=200)
+    plt.close(fig)
+
+
+def sweep(weights, data_yaml, sizes, backends, device='cpu', latency_images=100):
+    """对每个 (尺寸, 后端) 组合评估验证集 mAP 与 CPU 延迟"""
+    images = list_val_images(data_yaml, latency_images)
+    if device == 'cpu':
+        # CPU 不支持半精度推理，ultralytics 会静默回退到 FP32，测出的只是重复的 FP32 结果
+        skipped = [b for b in backends if BACKENDS[b]['half']]
+        if skipped:
+            print(f"CPU 上跳过半精度后端: {', '.join(skipped)}")
+        backends = [b for b in backends if not BACKENDS[b]['half']]
+    rows = []
+    for imgsz in sizes:
+        for backend in backends:
+            cfg = BACKENDS[backend]
+            path = weights if cfg['format'] is None else export_weights(weights, cfg['format'], imgsz)
+            model = YOLO(path, task='detect')
+
+            metrics = model.val(data=data_yaml, imgsz=imgsz, half=cfg['half'], device=device,
+                                batch=1, plots=False, verbose=False)
+            mean_ms, p95_ms, fps = measure_latency(model, images, imgsz, cfg['half'], device)
+            row = {
+                'imgsz': imgsz,
+                'backend': backend,
+                'weights': path,
+                # 记录推理实际使用的精度，而不是请求的精度
+                'half': bool(model.predictor.args.half),
+                'map50': float(metrics.box.map50),
+                'map50_95': float(metrics.box.map),
+                'latency_ms': mean_ms,
+                'p95_ms': p95_ms,
+                'fps': fps,
+            }
+            rows.append(row)
+            print(f"imgsz={imgsz:<4} {backend:<9} mAP50={row['map50']:.4f} "
+                  f"mAP50-95={row['map50_95']:.4f} {mean_ms:.1f}ms (p95 {p95_ms:.1f}ms) {fps:.1f} FPS")
+    return rows
+
+
+def main():
+    # 待评估的权重与数据集配置
+    weights = "./runs/detect/yolov115/weights/best.pt"
+    data_yaml = os.path.abspath("./data/data/data.yaml")
+    # 扫描的输入尺寸与后端，可修改
+    sizes = [320, 384, 416]
+    backends = ['fp32', 'half', 'onnx', 'openvino']
+    # 延迟测试设备；为 'cpu' 时跳过 half 后端
+    device = 'cpu'
+    # 允许的 mAP50-95 损失，用于选择部署点
+    tolerance = 0.01
+    save_dir = "./runs/sweep"
+    deploy_config = "./deploy.yaml"
+
+    os.makedirs(save_dir, exist_ok=True)
+    rows = sweep(weights, data_yaml, sizes, backends, device)
+    frontier = pareto_frontier(rows)
+
+    with open(os.path.join(save_dir, "sweep.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) + ['pareto'])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'pareto': row in frontier})
+    plot_frontier(rows, frontier, os.path.join(save_dir, "pareto.png"))
+
+    print("\n帕累托前沿:")
+    print(f"{'imgsz':>6} {'backend':>9} {'mAP50':>8} {'mAP50-95':>9} {'ms':>8} {'FPS':>7}")
+    for r in frontier:
+        print(f"{r['imgsz']:>6} {r['backend']:>9} {r['map50']:>8.4f} {r['map50_95']:>9.4f} "
+              f"{r['latency_ms']:>8.1f} {r['fps']:>7.1f}")
+
+    # 记录部署点，pred.py 启动时读取；保留 evaluate.py 写入的 conf / iou 等其它字段
+    point = choose_operating_point(frontier, tolerance)
+    config = {}
+    if os.path.exists(deploy_config):
+        with open(deploy_config, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    config.update({
+        'weights': point['weights'],
+        'imgsz': point['imgsz'],
+        'half': point['half'],
+        'backend': point['backend'],
+        'map50_95': round(point['map50_95'], 4),
+        'latency_ms': round(point['latency_ms'], 2),
+    })
+    with open(deploy_config, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    print(f"\n已选择 imgsz={point['imgsz']} {point['backend']}，写入 {deploy_config}")
+
+
+if __name__ == "__main__":
+    main()